@@ -9,15 +9,21 @@ Principles:
 4. Auto-detection - no script changes when files change
 """
 
+import functools
 import hashlib
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
 
 PROJECT_ROOT = Path(__file__).parent.parent
 PROJECT_FILE = PROJECT_ROOT / "PodoSoju.xcodeproj" / "project.pbxproj"
 SOJU_DIR = PROJECT_ROOT / "PodoSoju"
+CACHE_FILE = PROJECT_ROOT / ".build-cache" / "sync.hash"
+# Below this many files, thread startup costs more than sequential stat calls
+PARALLEL_STAT_THRESHOLD = 50
 
 # Fixed UUIDs matching original project - NEVER CHANGE THESE
 FIXED = {
@@ -42,31 +48,92 @@ FIXED = {
 }
 
 
+@functools.lru_cache(maxsize=None)
 def uuid_for(prefix: str, path: str) -> str:
     """Generate deterministic 24-char UUID from prefix:path"""
-    return hashlib.md5(f"{prefix}:{path}".encode()).hexdigest()[:24].upper()
+    return hashlib.blake2b(f"{prefix}:{path}".encode(), digest_size=12).hexdigest().upper()
+
+
+def _walk_swift_files(directory: str):
+    """Yield paths of Swift files under directory using os.scandir"""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_swift_files(entry.path)
+            elif entry.name.endswith(".swift") and entry.is_file():
+                yield entry.path
 
 
 def scan_swift_files() -> list[dict]:
     """Scan PodoSoju/ directory for Swift files"""
+    if not SOJU_DIR.is_dir():
+        sys.exit(f"❌ 소스 디렉토리를 찾을 수 없음: {SOJU_DIR}")
+
+    soju_dir = str(SOJU_DIR)
+    prefix = SOJU_DIR.name + os.sep
     files = []
-    for f in sorted(SOJU_DIR.rglob("*.swift")):
-        rel = f.relative_to(PROJECT_ROOT)
+    for p in _walk_swift_files(soju_dir):
+        rel = prefix + p[len(soju_dir) + len(os.sep):]
         # Group path: PodoSoju/Views/Settings/X.swift -> Views/Settings
-        parts = rel.parts[1:-1]  # Skip "PodoSoju" and filename
-        group = "/".join(parts) if parts else ""
+        parts = rel.split(os.sep)
+        group = "/".join(parts[1:-1])  # Skip "PodoSoju" and filename
 
         files.append({
-            "name": f.name,
-            "path": str(rel),
+            "name": parts[-1],
+            "path": rel,
             "group": group,
-            "file_id": uuid_for("file", str(rel)),
-            "build_id": uuid_for("build", str(rel)),
+            "file_id": uuid_for("file", rel),
+            "build_id": uuid_for("build", rel),
         })
     return files
 
 
-def build_group_tree(files: list[dict]) -> dict:
+def _mtime_ns(path) -> int:
+    return os.stat(path).st_mtime_ns
+
+
+def sync_key(files: list[dict]) -> str:
+    """Hash file paths and mtimes (plus this script) into a cache key"""
+    paths = [__file__] + [f["path"] for f in files]
+    full_paths = [__file__] + [PROJECT_ROOT / f["path"] for f in files]
+    if len(files) > PARALLEL_STAT_THRESHOLD:
+        # stat() releases the GIL, so threads overlap the syscalls
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            mtimes = list(ex.map(_mtime_ns, full_paths))
+    else:
+        mtimes = [_mtime_ns(p) for p in full_paths]
+    data = "".join(f"{path}\0{mtime}\n" for path, mtime in zip(paths, mtimes))
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def is_up_to_date(key: str) -> bool:
+    """Check whether the last pbxproj sync used the same key"""
+    try:
+        cached = CACHE_FILE.read_text(encoding="utf-8").strip()
+        # A project file edited after the last sync must be regenerated
+        return cached == key and PROJECT_FILE.stat().st_mtime_ns <= CACHE_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def project_matches(parts: list[str]) -> bool:
+    """Compare generated chunks against the project file on disk"""
+    try:
+        existing = memoryview(PROJECT_FILE.read_bytes())
+    except FileNotFoundError:
+        return False
+
+    pos = 0
+    for chunk in parts:
+        data = chunk.encode("utf-8")
+        end = pos + len(data)
+        if existing[pos:end] != data:
+            return False
+        pos = end
+    return pos == len(existing)
+
+
+def build_group_tree(files: list[dict]) -> defaultdict:
     """Build group hierarchy from files"""
     tree = defaultdict(lambda: {"files": [], "subgroups": set()})
 
@@ -81,41 +148,56 @@ def build_group_tree(files: list[dict]) -> dict:
             child = "/".join(parts[:i+1])
             tree[parent]["subgroups"].add(child)
 
-    return dict(tree)
+    return tree
 
 
-def generate_pbxproj(files: list[dict]) -> str:
-    """Generate complete project.pbxproj content"""
+def generate_pbxproj(files: list[dict]) -> list[str]:
+    """Generate complete project.pbxproj content as a list of chunks"""
+    # Sort once, by the key every section is emitted in; path breaks ties
+    files = sorted(files, key=lambda x: (x["name"], x["path"]))
     tree = build_group_tree(files)
 
-    # === PBXBuildFile ===
+    # Sort each group's children once, walking the tree breadth-first
+    queue = deque([""])
+    while queue:
+        info = tree[queue.popleft()]
+        info["_sorted_subs"] = sorted(info["subgroups"])
+        info["_sorted_files"] = info["files"]  # Filled from the sorted list above
+        queue.extend(info["_sorted_subs"])
+
+    # === PBXBuildFile / PBXFileReference / PBXSourcesBuildPhase ===
     build_lines = []
-    for f in sorted(files, key=lambda x: x["name"]):
+    ref_lines = []
+    source_files = []
+    for f in files:
+        name = f["name"]
+        file_id = f["file_id"]
+        build_id = f["build_id"]
+        path = f["path"]
+
         build_lines.append(
-            f'\t\t{f["build_id"]} /* {f["name"]} in Sources */ = '
-            f'{{isa = PBXBuildFile; fileRef = {f["file_id"]} /* {f["name"]} */; }};'
+            f'\t\t{build_id} /* {name} in Sources */ = '
+            f'{{isa = PBXBuildFile; fileRef = {file_id} /* {name} */; }};'
         )
-    build_lines.append(
-        f'\t\t{FIXED["sojukit_build"]} /* SojuKit in Frameworks */ = '
-        f'{{isa = PBXBuildFile; productRef = {FIXED["sojukit_dep"]} /* SojuKit */; }};'
-    )
-
-    # === PBXFileReference ===
-    ref_lines = []
-    for f in sorted(files, key=lambda x: x["name"]):
         # Files in subdirs need name attribute
         if f["group"]:
             ref_lines.append(
-                f'\t\t{f["file_id"]} /* {f["name"]} */ = {{isa = PBXFileReference; '
+                f'\t\t{file_id} /* {name} */ = {{isa = PBXFileReference; '
                 f'includeInIndex = 1; lastKnownFileType = sourcecode.swift; '
-                f'name = {f["name"]}; path = {f["path"]}; sourceTree = SOURCE_ROOT; }};'
+                f'name = {name}; path = {path}; sourceTree = SOURCE_ROOT; }};'
             )
         else:
             ref_lines.append(
-                f'\t\t{f["file_id"]} /* {f["name"]} */ = {{isa = PBXFileReference; '
+                f'\t\t{file_id} /* {name} */ = {{isa = PBXFileReference; '
                 f'includeInIndex = 1; lastKnownFileType = sourcecode.swift; '
-                f'path = {f["path"]}; sourceTree = SOURCE_ROOT; }};'
+                f'path = {path}; sourceTree = SOURCE_ROOT; }};'
             )
+        source_files.append(f'\t\t\t\t{build_id} /* {name} in Sources */,')
+
+    build_lines.append(
+        f'\t\t{FIXED["sojukit_build"]} /* SojuKit in Frameworks */ = '
+        f'{{isa = PBXBuildFile; productRef = {FIXED["sojukit_dep"]} /* SojuKit */; }};'
+    )
 
     ref_lines.append(
         f'\t\t{FIXED["soju_app"]} /* PodoSoju.app */ = {{isa = PBXFileReference; '
@@ -154,7 +236,7 @@ def generate_pbxproj(files: list[dict]) -> str:
 
     # Helper to generate a group entry
     def gen_group_entry(gpath: str):
-        info = tree.get(gpath, {"files": [], "subgroups": set()})
+        info = tree[gpath]
 
         if gpath == "":
             gid = FIXED["soju_group"]
@@ -167,20 +249,18 @@ def generate_pbxproj(files: list[dict]) -> str:
 
         children = []
         # Subgroups first
-        for sub in sorted(info["subgroups"]):
-            sub_name = sub.split("/")[-1]
-            sub_id = uuid_for("group", sub)
-            children.append(f'{sub_id} /* {sub_name} */')
+        for sub in info["_sorted_subs"]:
+            children.append(f'\t\t\t\t{uuid_for("group", sub)} /* {sub.split("/")[-1]} */,')
         # Files
-        for f in sorted(info["files"], key=lambda x: x["name"]):
-            children.append(f'{f["file_id"]} /* {f["name"]} */')
+        for f in info["_sorted_files"]:
+            children.append(f'\t\t\t\t{f["file_id"]} /* {f["name"]} */,')
 
-        children_str = ",\n".join(f"\t\t\t\t{c}" for c in children)
+        children_str = "\n".join(children)
 
         return f'''\t\t{gid} /* {gname} */ = {{
 \t\t\tisa = PBXGroup;
 \t\t\tchildren = (
-{children_str},
+{children_str}
 \t\t\t);
 \t\t\t{path_attr}
 \t\t\tsourceTree = "<group>";
@@ -189,37 +269,40 @@ def generate_pbxproj(files: list[dict]) -> str:
     # Soju group (root files + subgroups)
     group_lines.append(gen_group_entry(""))
 
-    # Recursive subgroups
-    def add_subgroups(gpath: str):
-        info = tree.get(gpath, {"files": [], "subgroups": set()})
-        for sub in sorted(info["subgroups"]):
-            group_lines.append(gen_group_entry(sub))
-            add_subgroups(sub)
+    # Subgroups in depth-first order, without recursion
+    stack = list(reversed(tree[""]["_sorted_subs"]))
+    while stack:
+        gpath = stack.pop()
+        group_lines.append(gen_group_entry(gpath))
+        stack.extend(reversed(tree[gpath]["_sorted_subs"]))
 
-    add_subgroups("")
+    # === Full pbxproj ===
+    # Assembled as a list of chunks so the caller can stream it to disk
+    # without building one big intermediate string.
+    parts = []
 
-    # === PBXSourcesBuildPhase ===
-    source_files = []
-    for f in sorted(files, key=lambda x: x["name"]):
-        source_files.append(f'\t\t\t\t{f["build_id"]} /* {f["name"]} in Sources */,')
-    source_files_str = "\n".join(source_files)
+    def add_lines(lines: list[str]):
+        for line in lines:
+            parts.append(line)
+            parts.append("\n")
 
-    # === Full pbxproj ===
-    return f'''// !$*UTF8*$!
-{{
+    parts.append('''// !$*UTF8*$!
+{
 \tarchiveVersion = 1;
-\tclasses = {{
-\t}};
+\tclasses = {
+\t};
 \tobjectVersion = 77;
-\tobjects = {{
+\tobjects = {
 
 /* Begin PBXBuildFile section */
-{chr(10).join(build_lines)}
-/* End PBXBuildFile section */
+''')
+    add_lines(build_lines)
+    parts.append('''/* End PBXBuildFile section */
 
 /* Begin PBXFileReference section */
-{chr(10).join(ref_lines)}
-/* End PBXFileReference section */
+''')
+    add_lines(ref_lines)
+    parts.append(f'''/* End PBXFileReference section */
 
 /* Begin PBXFrameworksBuildPhase section */
 \t\t{FIXED["frameworks_phase"]} /* Frameworks */ = {{
@@ -233,8 +316,9 @@ def generate_pbxproj(files: list[dict]) -> str:
 /* End PBXFrameworksBuildPhase section */
 
 /* Begin PBXGroup section */
-{chr(10).join(group_lines)}
-/* End PBXGroup section */
+''')
+    add_lines(group_lines)
+    parts.append(f'''/* End PBXGroup section */
 
 /* Begin PBXNativeTarget section */
 \t\t{FIXED["target"]} /* PodoSoju */ = {{
@@ -306,8 +390,9 @@ def generate_pbxproj(files: list[dict]) -> str:
 \t\t\tisa = PBXSourcesBuildPhase;
 \t\t\tbuildActionMask = 2147483647;
 \t\t\tfiles = (
-{source_files_str}
-\t\t\t);
+''')
+    add_lines(source_files)
+    parts.append(f'''\t\t\t);
 \t\t\trunOnlyForDeploymentPostprocessing = 0;
 \t\t}};
 /* End PBXSourcesBuildPhase section */
@@ -523,7 +608,9 @@ def generate_pbxproj(files: list[dict]) -> str:
 \t}};
 \trootObject = {FIXED["project"]} /* Project object */;
 }}
-'''
+''')
+
+    return parts
 
 
 def main():
@@ -535,30 +622,44 @@ def main():
     for f in files:
         print(f"   - {f['path']}")
 
-    # 2. Generate and save
-    content = generate_pbxproj(files)
-    PROJECT_FILE.write_text(content, encoding="utf-8")
-    print(f"\n✅ 프로젝트 파일 저장: {PROJECT_FILE}")
+    # 2. Generate and save, unless nothing changed since the last sync
+    key = sync_key(files)
+    if is_up_to_date(key):
+        print(f"\n✅ 변경 사항 없음 - 프로젝트 파일 재생성 생략: {PROJECT_FILE}")
+    else:
+        parts = generate_pbxproj(files)
+        if project_matches(parts):
+            print(f"\n✅ 프로젝트 파일 변경 없음: {PROJECT_FILE}")
+        else:
+            with open(PROJECT_FILE, "w", encoding="utf-8") as fh:
+                fh.writelines(parts)
+            print(f"\n✅ 프로젝트 파일 저장: {PROJECT_FILE}")
+        CACHE_FILE.parent.mkdir(exist_ok=True)
+        CACHE_FILE.write_text(key, encoding="utf-8")
 
-    # 3. Build test
+    # 3. Build test (always run; xcodebuild is incremental)
     print("\n🔨 빌드 테스트...")
-    result = subprocess.run(
+    # Stream merged output and keep only error lines instead of buffering the whole log
+    errors = []
+    with subprocess.Popen(
         ["xcodebuild", "-scheme", "PodoSoju", "-configuration", "Debug",
          "-derivedDataPath", "build", "-quiet", "build"],
         cwd=PROJECT_ROOT,
-        capture_output=True,
-        text=True
-    )
-
-    if result.returncode == 0:
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT
+    ) as proc:
+        for line in proc.stdout:
+            if b'error:' in line.lower():
+                errors.append(line)
+
+    if proc.returncode == 0:
         print("✅ 빌드 성공!")
         return 0
     else:
         print("❌ 빌드 실패!")
         # Show only error lines
-        for line in (result.stderr + result.stdout).split('\n'):
-            if 'error:' in line.lower():
-                print(f"   {line.strip()}")
+        for line in errors:
+            print(f"   {line.decode('utf-8', errors='replace').strip()}")
         return 1
 
 